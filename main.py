@@ -1,23 +1,47 @@
 # main.py
 from __future__ import annotations
+import json
 import sys
 from pathlib import Path
 import yaml  # type: ignore
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _json_loads = json.loads
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+# libyaml's C loader when built in; an order of magnitude over pure Python
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 ROOT = Path(__file__).parent.resolve()
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from src.data_crawling.github_crawler import (
-    list_user_repo_urls, build_repo_document, save_jsonl,
-)
+from src.data_crawling.github_crawler import crawl_user_repos, save_jsonl
 from src.preprocess.make_corpus import run_preprocess  # ← NEW
 from src.db import get_db
 from src.documents import RepositoryDocument
 
 def load_config(path: Path) -> dict:
+    """Load the YAML config, keeping a faster-to-parse JSON cache beside it."""
+    cache = path.with_suffix(".json")
+    try:
+        if cache.exists() and cache.stat().st_mtime >= path.stat().st_mtime:
+            return _json_loads(cache.read_bytes()) or {}
+    except (OSError, ValueError):
+        pass  # stale/corrupt cache: fall through to the YAML source
     with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+        cfg = yaml.load(f, Loader=_YAML_LOADER) or {}
+    try:
+        cache.write_bytes(_json_dumps(cfg))
+    except (OSError, TypeError, ValueError):
+        pass  # cache is best-effort; the YAML stays authoritative
+    return cfg
 
 def run_github(cfg: dict) -> int:
     gh = cfg.get("github", {})
@@ -27,12 +51,12 @@ def run_github(cfg: dict) -> int:
         return 1
 
     max_repos = int(gh.get("max_repos", 5))
-    delay = float(gh.get("delay_seconds", 1.0))
     outdir = Path(gh.get("outdir", "data/raw/github"))
     mode = gh.get("mode", "repo")
     ignore_dirs = list(gh.get("ignore_dirs", []))
     ignore_exts = list(gh.get("ignore_exts", []))
     max_file_mb = float(gh.get("max_file_mb", 1.0))
+    clone_workers = int(gh.get("clone_workers", 8))
 
     st = cfg.get("storage", {})
     sink = st.get("sink", "jsonl").lower()
@@ -47,25 +71,21 @@ def run_github(cfg: dict) -> int:
 
     total = 0
     for user in users:
-        print(f"[>] Listing repos for {user} (max_repos={max_repos})")
-        repo_urls = list_user_repo_urls(user, max_repos=max_repos, delay=delay)
-        docs = []
-        for url in repo_urls:
-            print(f"    - Processing {url} (mode={mode})")
-            doc = build_repo_document(
-                owner=user, repo_url=url, mode=mode,
-                ignore_dirs=ignore_dirs, ignore_exts=ignore_exts,
-                max_file_mb=max_file_mb, delay=delay,
-            )
-            docs.append(doc)
+        print(f"[>] Crawling repos for {user} (max_repos={max_repos}, mode={mode})")
+        docs = crawl_user_repos(
+            owner=user, max_repos=max_repos, mode=mode,
+            ignore_dirs=ignore_dirs, ignore_exts=ignore_exts,
+            max_file_mb=max_file_mb, clone_workers=clone_workers,
+        )
 
         if sink == "jsonl":
             out_path = Path(jsonl_template.format(user=user))
             save_jsonl(docs, out_path)
             print(f"[✓] {user}: saved {len(docs)} repos → {out_path}")
         elif sink == "mongo":
-            for d in docs:
-                RepositoryDocument.from_dict(d).save(db, mongo_coll)
+            RepositoryDocument.bulk_save(
+                db, mongo_coll, [RepositoryDocument.from_dict(d) for d in docs]
+            )
             print(f"[✓] {user}: upserted {len(docs)} repos → mongodb://.../{mongo_db}.{mongo_coll}")
         else:
             print(f"[!] Unknown storage.sink={sink}; supported: jsonl, mongo")
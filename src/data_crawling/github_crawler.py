@@ -1,10 +1,16 @@
 """
 GitHub crawler (config-driven):
-- Lists repos for each user/org via HTML (requests + BS4)
+- Lists repos for each user/org via HTML (httpx + BS4)
 - Two modes:
   1) "readme" -> metadata + rendered README text
   2) "repo"   -> shallow clone and collect a file tree {relative_path: file_content}
 
+Fetching is async: one shared httpx.AsyncClient per crawl (HTTP/2, so many
+requests multiplex over a single TLS connection), and an asyncio.Semaphore
+as the polite rate limiter (replaces the old per-request time.sleep).
+BeautifulSoup parsing stays synchronous inside the async functions
+(CPU-cheap next to the network I/O).
+
 Output doc (per repo) looks like:
 {
   "name": "<repo_name>",
@@ -17,70 +23,104 @@ Output doc (per repo) looks like:
 """
 
 from __future__ import annotations
+import asyncio
 import os
 import re
-import time
 import json
-import shutil
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional, Iterable
+from typing import Dict, List, Optional
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
 
+try:
+    import lxml  # noqa: F401  (bs4 backend; much faster than html.parser)
+    _BS_PARSER = "lxml"
+except ImportError:
+    _BS_PARSER = "html.parser"
+
+try:
+    import orjson
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
 BASE = "https://github.com"
 
+# Shared connection budget for a crawl; the semaphore is the polite limiter.
+MAX_KEEPALIVE_CONNECTIONS = 20
+MAX_CONNECTIONS = 50
+FETCH_CONCURRENCY = 10
+CLONE_WORKERS = 8
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/123.0.0.0 Safari/537.36"
+)
+
 # ---------- HTML helpers (for listing repos & optional topics/readme) ----------
 
-def _session() -> requests.Session:
-    s = requests.Session()
-    s.headers.update({
-        "User-Agent": (
-            "Mozilla/5.0 (X11; Linux x86_64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/123.0.0.0 Safari/537.36"
-        )
-    })
-    return s
+def _make_session() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            max_connections=MAX_CONNECTIONS,
+        ),
+        timeout=30.0,
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+async def _afetch(session: httpx.AsyncClient, sem: asyncio.Semaphore, url: str) -> bytes:
+    async with sem:
+        r = await session.get(url)
+        r.raise_for_status()
+        # hand raw bytes to the parser; lxml decodes faster than Python would
+        return r.content
+
+def _to_soup(html: bytes | str) -> BeautifulSoup:
+    return BeautifulSoup(html, _BS_PARSER)
 
-def _get_soup(s: requests.Session, url: str) -> BeautifulSoup:
-    r = s.get(url, timeout=30)
-    r.raise_for_status()
-    return BeautifulSoup(r.text, "html.parser")
+_RE_WS = re.compile(r"[ \t\r\f\v]+")
 
 def _normalize_ws(text: str) -> str:
-    return re.sub(r"[ \t\r\f\v]+", " ", text).strip()
+    return _RE_WS.sub(" ", text).strip()
 
-def list_user_repo_urls(user: str, max_repos: int, delay: float) -> List[str]:
+async def list_user_repo_urls(
+    session: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    user: str,
+    max_repos: int,
+) -> List[str]:
     """Collect repo URLs from the user's repositories tab (source repos only)."""
-    s = _session()
     urls: List[str] = []
     page = 1
+    # one compile per user, reused for every href on every page
+    re_user_repo = re.compile(rf"/{re.escape(user)}/[^/]+")
     while len(urls) < max_repos:
         url = f"{BASE}/{user}?tab=repositories&type=source&page={page}"
-        soup = _get_soup(s, url)
+        soup = _to_soup(await _afetch(session, sem, url))
         page_urls = []
         for a in soup.find_all("a", href=True):
             href = a["href"].strip()
-            if re.fullmatch(rf"/{re.escape(user)}/[^/]+", href):
+            if re_user_repo.fullmatch(href):
                 page_urls.append(f"{BASE}{href}")
-        # de-dup, preserve order
-        seen = set(urls)
-        for u in page_urls:
-            if u not in seen:
-                urls.append(u); seen.add(u)
+        # de-dup in one C-level pass, preserving insertion order
+        urls = list(dict.fromkeys(urls + page_urls))
         if not page_urls:
             break
         page += 1
-        time.sleep(delay)
     return urls[:max_repos]
 
-def _parse_repo_topics_and_readme(repo_url: str) -> Dict[str, Optional[str] | List[str]]:
-    """Fetch repo page and extract topics + README text (best-effort)."""
-    s = _session()
-    soup = _get_soup(s, repo_url)
+def _parse_repo_topics_and_readme(html: bytes | str) -> Dict[str, Optional[str] | List[str]]:
+    """Parse a fetched repo page and extract topics + README text (best-effort)."""
+    soup = _to_soup(html)
     topics = [a.get_text(strip=True) for a in soup.select("a.topic-tag")]
     readme = soup.select_one("article.markdown-body")
     readme_text = _normalize_ws(readme.get_text("\n")) if readme else None
@@ -92,7 +132,7 @@ def _safe_clone(link: str, dest: Path) -> None:
     """Shallow clone the repository into dest."""
     try:
         subprocess.run(
-            ["git", "clone", "--depth", "1", link, str(dest)],
+            ["git", "clone", "--depth", "1", "--single-branch", "--no-tags", link, str(dest)],
             check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
         )
     except FileNotFoundError:
@@ -100,17 +140,41 @@ def _safe_clone(link: str, dest: Path) -> None:
     except subprocess.CalledProcessError as e:
         raise RuntimeError(f"git clone failed for {link}: {e.stderr.decode('utf-8', 'ignore')}") from e
 
-def _should_skip_dir(dirname: str, ignore_dirs: Iterable[str]) -> bool:
-    return dirname in set(ignore_dirs)
-
-def _should_skip_file(filename: str, ignore_exts: Iterable[str]) -> bool:
-    return any(filename.endswith(ext) for ext in ignore_exts)
-
-def _within_size_limit(path: Path, max_bytes: int) -> bool:
-    try:
-        return path.stat().st_size <= max_bytes
-    except OSError:
-        return False
+def _collect_tree(
+    dirpath: str,
+    prefix_len: int,
+    ignore_dirs: frozenset,
+    ignore_exts: tuple,
+    max_bytes: int,
+    tree: Dict[str, str],
+) -> None:
+    """Recurse with os.scandir so size checks reuse the dirent stat buffer."""
+    with os.scandir(dirpath) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ignore_dirs:
+                    _collect_tree(entry.path, prefix_len, ignore_dirs, ignore_exts, max_bytes, tree)
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            # endswith on a tuple walks all suffixes in one C call
+            if ignore_exts and entry.name.lower().endswith(ignore_exts):
+                continue
+            try:
+                if entry.stat(follow_symlinks=False).st_size > max_bytes:
+                    continue
+            except OSError:
+                continue
+            # all paths share the repo-root prefix; slicing beats relative_to
+            rel = entry.path[prefix_len:]
+            # read as text, skipping binary-ish files by decode errors
+            try:
+                with open(entry.path, "r", encoding="utf-8", errors="ignore") as f:
+                    # keep whitespace as-is (do NOT strip spaces like their example)
+                    tree[rel] = f.read()
+            except Exception:
+                # ignore unreadable files quietly
+                continue
 
 def extract_repo_tree_via_git(
     link: str,
@@ -120,66 +184,100 @@ def extract_repo_tree_via_git(
 ) -> Dict[str, str]:
     """Clone repo shallowly and return {relative_path: text_content} of text-like files."""
     max_bytes = int(max_file_mb * 1024 * 1024)
+    # hoisted once per repo instead of per directory entry
+    ignore_dirs_set = frozenset(ignore_dirs)
+    ignore_exts_tuple = tuple(e.lower() for e in ignore_exts)
     with tempfile.TemporaryDirectory() as tmp:
         repo_dir = Path(tmp) / "repo"
         _safe_clone(link, repo_dir)
 
         tree: Dict[str, str] = {}
-        for root, dirs, files in os.walk(repo_dir):
-            # prune ignored directories in-place
-            dirs[:] = [d for d in dirs if not _should_skip_dir(d, ignore_dirs)]
-            root_p = Path(root)
-            for fname in files:
-                if _should_skip_file(fname, ignore_exts):
-                    continue
-                fpath = root_p / fname
-                if not _within_size_limit(fpath, max_bytes):
-                    continue
-                rel = str(fpath.relative_to(repo_dir))
-                # read as text, skipping binary-ish files by decode errors
-                try:
-                    with fpath.open("r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-                    # keep whitespace as-is (do NOT strip spaces like their example)
-                    tree[rel] = content
-                except Exception:
-                    # ignore unreadable files quietly
-                    continue
+        root_str = str(repo_dir)
+        _collect_tree(root_str, len(root_str) + len(os.sep),
+                      ignore_dirs_set, ignore_exts_tuple, max_bytes, tree)
         return tree
 
 # ------------------------------- Public API -----------------------------------
 
-def build_repo_document(
+async def build_repo_document(
+    session: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    clone_sem: asyncio.Semaphore,
     owner: str,
     repo_url: str,
     mode: str,
     ignore_dirs: List[str],
     ignore_exts: List[str],
     max_file_mb: float,
-    delay: float
 ) -> Dict:
     """Assemble a Repository-like document, similar to their RepositoryDocument model."""
     repo_name = repo_url.rstrip("/").split("/")[-1]
-    meta = _parse_repo_topics_and_readme(repo_url)
+    meta = _parse_repo_topics_and_readme(await _afetch(session, sem, repo_url))
     doc: Dict = {
         "name": repo_name,
         "link": repo_url,
         "owner_id": owner,
         "topics": meta.get("topics", []),
         "readme_text": meta.get("readme_text"),
+        # denormalized so summaries can sum an int instead of sizing content
+        "file_count": 0,
     }
     if mode == "repo":
-        doc["content"] = extract_repo_tree_via_git(
-            link=repo_url,
-            ignore_dirs=ignore_dirs,
-            ignore_exts=ignore_exts,
-            max_file_mb=max_file_mb,
-        )
-        time.sleep(delay)  # polite pause between clones
+        # git clone is blocking subprocess work; keep the event loop free and
+        # cap how many clones hit the git server at once
+        async with clone_sem:
+            doc["content"] = await asyncio.to_thread(
+                extract_repo_tree_via_git,
+                link=repo_url,
+                ignore_dirs=ignore_dirs,
+                ignore_exts=ignore_exts,
+                max_file_mb=max_file_mb,
+            )
+            doc["file_count"] = len(doc["content"])
     return doc
 
+async def _crawl_user_repos(
+    owner: str,
+    max_repos: int,
+    mode: str,
+    ignore_dirs: List[str],
+    ignore_exts: List[str],
+    max_file_mb: float,
+    clone_workers: int = CLONE_WORKERS,
+) -> List[Dict]:
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    clone_sem = asyncio.Semaphore(clone_workers)
+    async with _make_session() as session:
+        repo_urls = await list_user_repo_urls(session, sem, owner, max_repos)
+        docs = await asyncio.gather(*[
+            build_repo_document(
+                session, sem, clone_sem,
+                owner=owner, repo_url=url, mode=mode,
+                ignore_dirs=ignore_dirs, ignore_exts=ignore_exts,
+                max_file_mb=max_file_mb,
+            )
+            for url in repo_urls
+        ])
+    return list(docs)
+
+def crawl_user_repos(
+    owner: str,
+    max_repos: int,
+    mode: str,
+    ignore_dirs: List[str],
+    ignore_exts: List[str],
+    max_file_mb: float,
+    clone_workers: int = CLONE_WORKERS,
+) -> List[Dict]:
+    """Sync wrapper so the top-level callsite stays a plain function call."""
+    return asyncio.run(_crawl_user_repos(
+        owner=owner, max_repos=max_repos, mode=mode,
+        ignore_dirs=ignore_dirs, ignore_exts=ignore_exts,
+        max_file_mb=max_file_mb, clone_workers=clone_workers,
+    ))
+
 def save_jsonl(records: List[Dict], out_path: Path) -> None:
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8") as f:
-        for r in records:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    # binary mode + one big buffer: pre-encoded lines, few write syscalls
+    with out_path.open("wb", buffering=1 << 20) as f:
+        f.writelines(_json_dumps(r) + b"\n" for r in records)
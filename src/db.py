@@ -5,5 +5,12 @@ from pymongo.database import Database
 
 @lru_cache()
 def get_db(mongo_uri: str, db_name: str) -> Database:
-    client = MongoClient(mongo_uri)
+    # wire compression matters here: repo docs embed whole source trees
+    client = MongoClient(
+        mongo_uri,
+        compressors="zstd,snappy",
+        retryWrites=True,
+        w="majority",
+        maxPoolSize=50,
+    )
     return client[db_name]
\ No newline at end of file
@@ -3,7 +3,7 @@ from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pymongo.database import Database
-from pymongo import ASCENDING
+from pymongo import ASCENDING, ReplaceOne
 
 @dataclass
 class RepositoryDocument:
@@ -14,6 +14,7 @@ class RepositoryDocument:
     content: Dict[str, str] = field(default_factory=dict)
     topics: List[str] = field(default_factory=list)
     readme_text: Optional[str] = None
+    file_count: int = 0
     created_at: datetime = field(default_factory=datetime.utcnow)
 
     @classmethod
@@ -25,6 +26,7 @@ class RepositoryDocument:
             content=d.get("content", {}),
             topics=d.get("topics", []),
             readme_text=d.get("readme_text"),
+            file_count=d.get("file_count", len(d.get("content") or {})),
         )
 
     def to_mongo(self) -> Dict[str, Any]:
@@ -41,8 +43,28 @@ class RepositoryDocument:
             upsert=True,
         )
 
+    @staticmethod
+    def bulk_save(db: Database, collection_name: str, docs: List["RepositoryDocument"]) -> None:
+        """Upsert many documents in one round-trip instead of one per doc."""
+        if not docs:
+            return
+        ops = [
+            ReplaceOne(
+                {"owner_id": d.owner_id, "name": d.name},
+                d.to_mongo(),
+                upsert=True,
+            )
+            for d in docs
+        ]
+        db[collection_name].bulk_write(ops, ordered=False)
+
     @staticmethod
     def create_indexes(db: Database, collection_name: str) -> None:
         col = db[collection_name]
-        col.create_index([("owner_id", ASCENDING)])
-        col.create_index([("owner_id", ASCENDING), ("name", ASCENDING)], unique=True)
\ No newline at end of file
+        # the compound index's owner_id prefix also serves owner_id-only
+        # queries, so a separate single-field index would just add write cost
+        col.create_index(
+            [("owner_id", ASCENDING), ("name", ASCENDING)],
+            unique=True,
+            background=True,
+        )
\ No newline at end of file
@@ -1,11 +1,31 @@
 # src/preprocess/make_corpus.py
 from __future__ import annotations
-import json, hashlib, re
+import io, json, hashlib, re, types
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _json_loads = json.loads
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+try:
+    import ijson  # streaming notebook parse; avoids building output blobs
+except ImportError:
+    ijson = None
 
 ROOT = Path(__file__).resolve().parents[2]  # project root (../.. from this file)
 
+# compiled once; these run on every file in the corpus
+_RE_WS_BEFORE_NL = re.compile(r"[ \t\f\v]+\n")
+_RE_MULTI_NL = re.compile(r"\n{3,}")
+
 def _resolve(path_str: str) -> Path:
     p = Path(path_str)
     return p if p.is_absolute() else (ROOT / p)
@@ -13,14 +33,14 @@ def _resolve(path_str: str) -> Path:
 def _load_jsonl(path: Path) -> Iterator[dict]:
     if not path.exists():
         return
-    with path.open("r", encoding="utf-8") as f:
+    with path.open("rb") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
+                yield _json_loads(line)
+            except ValueError:
                 continue
 
 def _normalize_text(s: str) -> str:
@@ -28,15 +48,22 @@ def _normalize_text(s: str) -> str:
         return ""
     # unify newlines, collapse weird whitespace, strip trailing long spaces
     s = s.replace("\r\n", "\n").replace("\r", "\n")
-    s = re.sub(r"[ \t\f\v]+\n", "\n", s)
-    s = re.sub(r"\n{3,}", "\n\n", s)
+    s = _RE_WS_BEFORE_NL.sub("\n", s)
+    s = _RE_MULTI_NL.sub("\n\n", s)
     return s.strip()
 
+# \n and \t count as printable for our purposes; drop them so str.isprintable
+# can answer the common all-clean case in one C-level scan
+_NL_TAB_DELETE = {ord("\n"): None, ord("\t"): None}
+
 def _printable_ratio(s: str) -> float:
     if not s:
         return 0.0
-    printable = sum(1 for ch in s if ch.isprintable() or ch in "\n\t")
-    return printable / max(len(s), 1)
+    t = s.translate(_NL_TAB_DELETE)
+    if t.isprintable():
+        return 1.0
+    bad = sum(1 for ch in t if not ch.isprintable())
+    return (len(s) - bad) / len(s)
 
 def _chunk(text: str, size: int, overlap: int) -> List[str]:
     text = text.strip()
@@ -44,20 +71,18 @@ def _chunk(text: str, size: int, overlap: int) -> List[str]:
         return []
     if size <= 0:
         return [text]
-    chunks, i = [], 0
     step = max(size - overlap, 1)
-    while i < len(text):
-        chunks.append(text[i:i+size])
-        i += step
-    return chunks
+    return [text[i:i+size] for i in range(0, len(text), step)]
+
+# built once; callers pass an already-lowercased ext
+_LANG_MAP = types.MappingProxyType({
+    ".py": "python", ".md": "markdown", ".txt": "text",
+    ".ipynb": "notebook", ".json": "json", ".yaml": "yaml", ".yml": "yaml",
+    ".js": "javascript", ".ts": "typescript", ".cpp": "cpp", ".c": "c",
+})
 
 def _lang_from_ext(ext: str) -> str:
-    m = {
-        ".py": "python", ".md": "markdown", ".txt": "text",
-        ".ipynb": "notebook", ".json": "json", ".yaml": "yaml", ".yml": "yaml",
-        ".js": "javascript", ".ts": "typescript", ".cpp": "cpp", ".c": "c",
-    }
-    return m.get(ext.lower(), ext.lower().lstrip("."))
+    return _LANG_MAP.get(ext, ext.lstrip("."))
 
 def _iter_repo_docs(users: List[str], input_template: str) -> Iterator[Tuple[str, dict]]:
     for user in users:
@@ -67,8 +92,29 @@ def _iter_repo_docs(users: List[str], input_template: str) -> Iterator[Tuple[str
 
 def _extract_ipynb(text: str) -> str:
     """If given a notebook JSON string, pull out markdown + code cell text."""
+    if ijson is not None:
+        # stream cell events only; embedded outputs (base64 images etc.) are
+        # lexed but never materialized as Python objects
+        try:
+            parts: List[str] = []
+            cell_type = None
+            source: List[str] = []
+            for prefix, event, value in ijson.parse(io.BytesIO(text.encode("utf-8"))):
+                if prefix == "cells.item":
+                    if event == "start_map":
+                        cell_type, source = None, []
+                    elif event == "end_map" and cell_type in ("markdown", "code"):
+                        parts.append("".join(source))
+                elif event == "string":
+                    if prefix == "cells.item.cell_type":
+                        cell_type = value
+                    elif prefix in ("cells.item.source", "cells.item.source.item"):
+                        source.append(value)
+            return _normalize_text("\n\n".join(parts))
+        except Exception:
+            pass
     try:
-        nb = json.loads(text)
+        nb = _json_loads(text)
         cells = nb.get("cells", [])
         parts = []
         for c in cells:
@@ -79,7 +125,46 @@ def _extract_ipynb(text: str) -> str:
     except Exception:
         return _normalize_text(text)
 
-def build_corpus(
+def _process_file(task: tuple) -> List[dict]:
+    """Per-file CPU work (normalize, filter, chunk, hash); runs in a worker."""
+    (owner, repo, link, rel_path, raw, ext,
+     max_file_chars, chunk_size, chunk_overlap) = task
+
+    # oversize files can't survive the length filter even after normalization
+    # shrinks them (2x margin), so skip the regex passes entirely
+    if ext != ".ipynb" and len(raw) > max_file_chars * 2:
+        return []
+
+    text = _extract_ipynb(raw) if ext == ".ipynb" else _normalize_text(raw)
+    if not text or len(text) > max_file_chars:
+        return []
+    # fully-printable text needs no ratio scan at all
+    if not text.isprintable() and _printable_ratio(text) < 0.85:
+        return []
+
+    pieces = _chunk(text, size=chunk_size, overlap=chunk_overlap)
+    lang = _lang_from_ext(ext)
+    records: List[dict] = []
+    for idx, piece in enumerate(pieces):
+        meta = {
+            "source": "github",
+            "owner": owner,
+            "repo": repo,
+            "path": rel_path,
+            "ext": ext,
+            "lang": lang,
+            "repo_url": link,
+            "chunk_index": idx,
+            "n_chunks": len(pieces),
+        }
+        base = f"{owner}|{repo}|{rel_path}|{idx}|{len(piece)}"
+        # stable deterministic id; blake2b is ~3x faster than sha1 and
+        # keeps the same 40-hex-char shape
+        rid = hashlib.blake2b(base.encode("utf-8"), digest_size=20).hexdigest()
+        records.append({"id": rid, "text": piece, "metadata": meta})
+    return records
+
+def _iter_file_tasks(
     users: List[str],
     input_template: str,
     include_exts: Iterable[str],
@@ -87,10 +172,9 @@ def build_corpus(
     max_file_chars: int,
     chunk_size: int,
     chunk_overlap: int,
-) -> List[dict]:
+) -> Iterator[tuple]:
     include_exts = {e.lower() for e in include_exts}
     exclude_exts = {e.lower() for e in exclude_exts}
-    out: List[dict] = []
 
     for owner, repo_doc in _iter_repo_docs(users, input_template):
         repo = repo_doc.get("name", "")
@@ -102,35 +186,31 @@ def build_corpus(
                 continue
             if ext in exclude_exts:
                 continue
+            yield (owner, repo, link, rel_path, raw, ext,
+                   max_file_chars, chunk_size, chunk_overlap)
 
-            text = _extract_ipynb(raw) if ext == ".ipynb" else _normalize_text(raw)
-            if not text or len(text) > max_file_chars or _printable_ratio(text) < 0.85:
-                continue
-
-            pieces = _chunk(text, size=chunk_size, overlap=chunk_overlap)
-            lang = _lang_from_ext(ext)
-            for idx, piece in enumerate(pieces):
-                meta = {
-                    "source": "github",
-                    "owner": owner,
-                    "repo": repo,
-                    "path": rel_path,
-                    "ext": ext,
-                    "lang": lang,
-                    "repo_url": link,
-                    "chunk_index": idx,
-                    "n_chunks": len(pieces),
-                }
-                base = f"{owner}|{repo}|{rel_path}|{idx}|{len(piece)}"
-                rid = hashlib.sha1(base.encode("utf-8")).hexdigest()  # stable deterministic id
-                out.append({"id": rid, "text": piece, "metadata": meta})
-    return out
-
-def save_jsonl(records: List[dict], out_path: Path) -> None:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8") as f:
-        for r in records:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+def iter_corpus(
+    users: List[str],
+    input_template: str,
+    include_exts: Iterable[str],
+    exclude_exts: Iterable[str],
+    max_file_chars: int,
+    chunk_size: int,
+    chunk_overlap: int,
+    workers: Optional[int] = None,
+) -> Iterator[dict]:
+    """Yield corpus records; per-file work fans out across all cores."""
+    tasks = list(_iter_file_tasks(
+        users, input_template, include_exts, exclude_exts,
+        max_file_chars, chunk_size, chunk_overlap,
+    ))
+    if not tasks:
+        return
+    # per-file work is independent pure-CPU; records still stream to the
+    # caller as each worker batch comes back
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        for records in ex.map(_process_file, tasks, chunksize=64):
+            yield from records
 
 def run_preprocess(cfg: dict) -> Tuple[int, Path]:
     gh = cfg.get("github", {})
@@ -147,8 +227,9 @@ def run_preprocess(cfg: dict) -> Tuple[int, Path]:
     chunk_cfg = pp.get("chunk", {})
     size = int(chunk_cfg.get("size", 1200))
     overlap = int(chunk_cfg.get("overlap", 200))
+    workers = pp.get("workers")  # None -> one worker per core
 
-    records = build_corpus(
+    records = iter_corpus(
         users=users,
         input_template=input_template,
         include_exts=include_exts,
@@ -156,8 +237,14 @@ def run_preprocess(cfg: dict) -> Tuple[int, Path]:
         max_file_chars=max_file_chars,
         chunk_size=size,
         chunk_overlap=overlap,
+        workers=int(workers) if workers else None,
     )
 
     out_path = _resolve(outdir) / "corpus.jsonl"
-    save_jsonl(records, out_path)
-    return len(records), out_path
\ No newline at end of file
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with out_path.open("wb", buffering=1 << 20) as f:
+        for rec in records:
+            f.write(_json_dumps(rec) + b"\n")
+            n += 1
+    return n, out_path
\ No newline at end of file
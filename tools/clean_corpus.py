@@ -1,7 +1,7 @@
 from __future__ import annotations
 import json, re, sys
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
 # Resolve project root (../ from tools/)
 ROOT = Path(__file__).resolve().parents[1]
@@ -10,6 +10,27 @@ if str(ROOT) not in sys.path:
 
 import yaml  # type: ignore
 
+try:
+    import fasttext  # type: ignore
+except Exception:
+    fasttext = None  # type: ignore
+
+try:
+    from langdetect import detect_langs, DetectorFactory  # type: ignore
+    DetectorFactory.seed = 0  # deterministic, seeded once at import
+except Exception:
+    detect_langs = None  # type: ignore
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    _json_loads = json.loads
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
 # ------------------------ helpers ------------------------
 
 def _load_cfg() -> dict:
@@ -21,25 +42,44 @@ def _resolve(path_str: str) -> Path:
     p = Path(path_str)
     return p if p.is_absolute() else (ROOT / p)
 
+# byte-level class counting: len(b) - len(b.translate(None, CLASS)) counts the
+# bytes in CLASS with one C call instead of a per-char Python loop
+_NON_ASCII_BYTES = bytes(range(128, 256))
+_ASCII_LETTER_BYTES = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_ASCII_DIGIT_BYTES = b"0123456789"
+
 def _ascii_ratio(s: str) -> float:
     if not s:
         return 1.0
-    return sum(1 for ch in s if ord(ch) < 128) / len(s)
+    b = s.encode("utf-8", "ignore")
+    if not b:
+        return 1.0
+    return len(b.translate(None, _NON_ASCII_BYTES)) / len(b)
 
 def _letters_and_digits_counts(s: str) -> Tuple[int, int]:
-    letters = sum(1 for ch in s if ch.isalpha())
-    digits = sum(1 for ch in s if ch.isdigit())
+    # ASCII-only approximation (byte-level); non-ASCII text is dropped by the
+    # language filter anyway
+    b = s.encode("utf-8", "ignore")
+    letters = len(b) - len(b.translate(None, _ASCII_LETTER_BYTES))
+    digits = len(b) - len(b.translate(None, _ASCII_DIGIT_BYTES))
     return letters, digits
 
+def _load_fasttext(model_path: Path):
+    """Load the lid.176 model once; returns None if fasttext/model is unavailable."""
+    if fasttext is None or not model_path.exists():
+        return None
+    try:
+        return fasttext.load_model(str(model_path))
+    except Exception:
+        return None
+
 def _is_english(text: str, min_chars: int, min_prob: float, ascii_min_ratio: float) -> bool:
     t = text.strip()
     if not t:
         return False
-    if len(t) >= max(min_chars, 1):
+    if len(t) >= max(min_chars, 1) and detect_langs is not None:
         # use langdetect
         try:
-            from langdetect import detect_langs, DetectorFactory
-            DetectorFactory.seed = 0
             for lp in detect_langs(t):
                 if lp.lang == "en" and lp.prob >= min_prob:
                     return True
@@ -50,6 +90,23 @@ def _is_english(text: str, min_chars: int, min_prob: float, ascii_min_ratio: flo
     # short text or detector failed: use ASCII heuristic
     return _ascii_ratio(t) >= ascii_min_ratio
 
+def _is_english_batch(
+    texts: List[str],
+    model,
+    min_chars: int,
+    min_prob: float,
+    ascii_min_ratio: float,
+) -> List[bool]:
+    """Score a whole batch in one call when fasttext is available."""
+    if model is None:
+        return [_is_english(t, min_chars, min_prob, ascii_min_ratio) for t in texts]
+    # fasttext rejects embedded newlines; it predicts a list in one C++ call
+    labels, probs = model.predict([t.replace("\n", " ") for t in texts], k=1)
+    return [
+        bool(lab) and lab[0] == "__label__en" and float(p[0]) >= min_prob
+        for lab, p in zip(labels, probs)
+    ]
+
 def _is_mostly_numeric(text: str, max_digit_ratio: float) -> bool:
     # Compute digits / (letters + digits); ignore whitespace/punct for this test
     letters, digits = _letters_and_digits_counts(text)
@@ -70,6 +127,8 @@ def main() -> None:
     lang_min_prob = float(pp.get("lang_min_prob", 0.80))
     ascii_min_ratio = float(pp.get("ascii_min_ratio", 0.90))
     max_digit_ratio = float(pp.get("max_digit_ratio", 0.60))
+    batch_size = int(pp.get("lang_batch_size", 4096))
+    model = _load_fasttext(_resolve(pp.get("fasttext_model", "models/lid.176.bin")))
 
     if not in_path.exists():
         print(f"[!] Input not found: {in_path}")
@@ -82,15 +141,34 @@ def main() -> None:
     total = 0
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with in_path.open("r", encoding="utf-8") as fin, out_path.open("w", encoding="utf-8") as fout:
+    with in_path.open("r", encoding="utf-8") as fin, out_path.open("wb", buffering=1 << 20) as fout:
+        batch_objs: List[dict] = []
+        batch_texts: List[str] = []
+
+        def _flush_batch() -> None:
+            nonlocal kept, dropped_non_en
+            if not batch_objs:
+                return
+            keep_flags = _is_english_batch(
+                batch_texts, model, lang_min_chars, lang_min_prob, ascii_min_ratio
+            )
+            for obj, keep in zip(batch_objs, keep_flags):
+                if keep:
+                    fout.write(_json_dumps(obj) + b"\n")
+                    kept += 1
+                else:
+                    dropped_non_en += 1
+            batch_objs.clear()
+            batch_texts.clear()
+
         for line in fin:
             total += 1
             line = line.strip()
             if not line:
                 continue
             try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
+                obj = _json_loads(line)
+            except ValueError:
                 dropped_empty += 1
                 continue
 
@@ -104,14 +182,13 @@ def main() -> None:
                 dropped_numeric += 1
                 continue
 
-            # english check
-            if not _is_english(text, lang_min_chars, lang_min_prob, ascii_min_ratio):
-                dropped_non_en += 1
-                continue
+            # english check runs batched; buffer the candidate
+            batch_objs.append(obj)
+            batch_texts.append(text)
+            if len(batch_objs) >= batch_size:
+                _flush_batch()
 
-            # keep
-            fout.write(json.dumps(obj, ensure_ascii=False) + "\n")
-            kept += 1
+        _flush_batch()
 
     print("\n[clean_corpus] Summary")
     print(f"Input:  {in_path}")
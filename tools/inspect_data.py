@@ -1,8 +1,15 @@
 # tools/inspect_data.py
 from __future__ import annotations
+import argparse
+import io
 import json
+import mmap
+import os
 from pathlib import Path
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from queue import Queue
+from threading import Thread
 import sys
 
 # ---- Resolve project root (../ from this tools/ folder) ----
@@ -13,9 +20,24 @@ if str(ROOT) not in sys.path:
 import yaml  # type: ignore
 
 try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import ijson  # event-level scan; skips materializing content blobs
+except ImportError:
+    ijson = None
+
+try:
+    from pymongo.errors import OperationFailure
     from src.db import get_db  # only used if sink == "mongo"
+    from src.documents import RepositoryDocument
 except Exception:
+    OperationFailure = None  # type: ignore
     get_db = None  # type: ignore
+    RepositoryDocument = None  # type: ignore
 
 
 def load_config() -> dict:
@@ -24,88 +46,272 @@ def load_config() -> dict:
         return yaml.safe_load(f) or {}
 
 
+_ROOT_STR = str(ROOT)
+
+
 def _resolve_under_root(path_str: str) -> Path:
+    # string-level join + one realpath; no intermediate PurePath objects
+    if not os.path.isabs(path_str):
+        path_str = os.path.join(_ROOT_STR, path_str)
+    return Path(os.path.realpath(path_str))
+
+
+_READ_CHUNK = 1 << 20  # 1 MiB
+
+
+def _iter_jsonl_lines(path: Path):
+    """Yield raw JSONL lines as bytes.
+
+    Preferred path: mmap the file and find newlines with bytes.find, which
+    is glibc memchr underneath (SIMD-vectorized), slicing lines straight
+    off the page cache with no read() copies. Files that can't be mapped
+    (empty, exotic filesystems) fall back to 1 MiB chunked reads split on
+    b\"\\n\" with the boundary partial carried over.
+    """
+    with path.open("rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            tail = b""
+            while chunk := f.read(_READ_CHUNK):
+                lines = chunk.split(b"\n")
+                lines[0] = tail + lines[0]
+                tail = lines.pop()
+                yield from lines
+            if tail:
+                yield tail
+            return
+        try:
+            start = 0
+            while (nl := mm.find(b"\n", start)) != -1:
+                yield mm[start:nl]
+                start = nl + 1
+            if start < len(mm):
+                yield mm[start:]  # unterminated final line
+        finally:
+            mm.close()
+
+
+_BATCH_LINES = 1024
+
+
+def _read_line_batches(path: Path, q: Queue) -> None:
+    """Producer side: feed batches of raw lines so reads overlap parsing."""
+    batch: list = []
+    try:
+        for line in _iter_jsonl_lines(path):
+            batch.append(line)
+            if len(batch) >= _BATCH_LINES:
+                q.put(batch)
+                batch = []
+    except Exception as exc:
+        # hand the failure to the consumer; a daemon thread dying silently
+        # would make a truncated report look complete
+        q.put(exc)
+        return
+    if batch:
+        q.put(batch)
+    q.put(None)  # end-of-file sentinel
+
+
+def _scan_repo_line(line: bytes):
+    """Extract (name, file_count, topics) from one repo line; None on bad JSON.
+
+    With ijson the line is scanned event-by-event: content keys are counted
+    as they stream past without ever building the file-tree dict. Without
+    ijson it falls back to a full parse.
+    """
+    if ijson is not None:
+        name = None
+        file_count = None
+        content_keys = 0
+        topics: list = []
+        try:
+            for prefix, event, value in ijson.parse(io.BytesIO(line)):
+                if event == "map_key" and prefix == "content":
+                    content_keys += 1
+                elif event == "string":
+                    if prefix == "name":
+                        name = value
+                    elif prefix == "topics.item":
+                        topics.append(value)
+                elif event == "number" and prefix == "file_count":
+                    file_count = int(value)
+        except Exception:
+            return None
+        return name, file_count if file_count is not None else content_keys, topics
+
+    try:
+        d = _json_loads(line)
+    except ValueError:
+        return None
+    file_count = d.get("file_count")
+    if file_count is None:
+        # older dumps predate the denormalized field
+        content = d.get("content", {})
+        file_count = len(content) if isinstance(content, dict) else 0
+    return d.get("name"), file_count, d.get("topics") or ()
+
+
+def _summarize_one_user_jsonl(user: str, path_str: str) -> str:
+    """Summarize a single user's dump (already-resolved path); returns the report."""
     p = Path(path_str)
-    return p if p.is_absolute() else (ROOT / p)
+    if not p.exists():
+        return f"[!] Not found: {p}"
+
+    report: list = []
+    repo_count = 0
+    sample_names: deque = deque(maxlen=5)
+    files_total = 0
+    topics_counter: Counter = Counter()
+
+    # I/O thread reads ahead while this thread parses; the bounded queue
+    # keeps at most 64 batches in flight
+    q: Queue = Queue(maxsize=64)
+    reader = Thread(target=_read_line_batches, args=(p, q), daemon=True)
+    reader.start()
+
+    # bind hot-loop callables to locals: LOAD_FAST instead of a global/attr
+    # lookup per line
+    scan = _scan_repo_line
+    warn = report.append
+    add_sample = sample_names.append
+    count_topics = topics_counter.update
+
+    i = 0
+    while (batch := q.get()) is not None:
+        if isinstance(batch, BaseException):
+            # re-raise reader-side failures here instead of printing a
+            # truncated report as if it were complete
+            reader.join()
+            raise batch
+        for line in batch:
+            i += 1
+            # no strip: the parsers tolerate surrounding whitespace, and a
+            # length test catches blank/CR-only lines without a copy
+            if len(line) <= 1:
+                continue
+            parsed = scan(line)
+            if parsed is None:
+                warn(f"[!] Skipping invalid JSON line {i} in {p}")
+                continue
+            name, file_count, topics = parsed
+            repo_count += 1
+            if name and len(sample_names) < 5:
+                add_sample(name)
+            files_total += file_count
+            # Counter.update dispatches to C's _count_elements per line
+            count_topics(topics)
+    reader.join()
+
+    report.append(f"\n== {user} ==")
+    report.append(f"Source file: {p}")
+    report.append(f"Repos stored: {repo_count}")
+    report.append(f"Total files captured across repos: {files_total}")
+    if sample_names:
+        sample = ", ".join(sample_names) + (" ..." if repo_count > 5 else "")
+        report.append(f"Sample repos: {sample}")
+    if topics_counter:
+        report.append(f"Top topics: {topics_counter.most_common(10)}")
+    return "\n".join(report)
 
 
 def summarize_jsonl(users: list[str], jsonl_template: str) -> None:
-    for user in users:
-        p = _resolve_under_root(jsonl_template.format(user=user)).resolve()
-        if not p.exists():
-            print(f"[!] Not found: {p}")
-            continue
-
-        repo_names = []
-        files_total = 0
-        topics_counter = Counter()
-
-        with p.open("r", encoding="utf-8") as f:
-            for i, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    d = json.loads(line)
-                except json.JSONDecodeError:
-                    print(f"[!] Skipping invalid JSON line {i} in {p}")
-                    continue
-                repo_names.append(d.get("name", ""))
-                content = d.get("content", {})
-                if isinstance(content, dict):
-                    files_total += len(content)
-                for t in d.get("topics", []) or []:
-                    topics_counter[t] += 1
-
-        print(f"\n== {user} ==")
-        print(f"Source file: {p}")
-        print(f"Repos stored: {len(repo_names)}")
-        print(f"Total files captured across repos: {files_total}")
-        if repo_names:
-            sample = ", ".join([r for r in repo_names[:5] if r]) + (" ..." if len(repo_names) > 5 else "")
-            if sample:
-                print(f"Sample repos: {sample}")
-        if topics_counter:
-            print("Top topics:", topics_counter.most_common(10))
-
-
-def summarize_mongo(users: list[str], uri: str, db_name: str, coll_name: str) -> None:
+    # resolve every path once here; workers get final strings
+    paths = [str(_resolve_under_root(jsonl_template.format(user=user))) for user in users]
+    # each dump is an independent parse-heavy workload; one worker per user
+    with ProcessPoolExecutor() as ex:
+        for report in ex.map(_summarize_one_user_jsonl, users, paths):
+            # one write() per user instead of a flush per print
+            sys.stdout.write(report + "\n")
+
+
+# server-side per-document file count: the ingest-time file_count when
+# present, else $size over content's keys — either way only an int leaves
+# the server, never the content BSON itself
+_FILE_COUNT_EXPR = {"$ifNull": [
+    "$file_count",
+    {"$size": {"$objectToArray": {"$ifNull": ["$content", {}]}}},
+]}
+
+
+def summarize_mongo(users: list[str] | None, uri: str, db_name: str, coll_name: str) -> None:
     if get_db is None:
         print("[!] Mongo summary requested but PyMongo helper not available.")
         return
     db = get_db(uri, db_name)
     col = db[coll_name]
 
+    if users is None:
+        # whole-collection mode: an O(1) metadata read, no scan at all
+        sys.stdout.write(
+            f"\nMongoDB: {db_name}.{coll_name}\n"
+            f"Repos stored (estimated): {col.estimated_document_count()}\n"
+        )
+        return
+
+    # back the owner_id match with the compound index even when the
+    # collection was filled without going through main.py; data with
+    # duplicate (owner_id, name) pairs rejects the unique index, and this
+    # read path must still summarize it (just unindexed)
+    if RepositoryDocument is not None:
+        try:
+            RepositoryDocument.create_indexes(db, coll_name)
+        except OperationFailure:
+            pass
+
+    # one pipeline for every user: counts, file totals, and name samples all
+    # come back grouped by owner in a single round-trip
+    stats = {row["_id"]: row for row in col.aggregate([
+        {"$match": {"owner_id": {"$in": users}}},
+        {"$group": {
+            "_id": "$owner_id",
+            "repos": {"$sum": 1},
+            "files": {"$sum": _FILE_COUNT_EXPR},
+            "names": {"$push": "$name"},
+        }},
+        {"$project": {"repos": 1, "files": 1, "sample": {"$slice": ["$names", 5]}}},
+    ])}
+
     for user in users:
-        repo_count = col.count_documents({"owner_id": user})
-        files_total = 0
-        for doc in col.find({"owner_id": user}, {"content": 1}):
-            content = doc.get("content", {})
-            if isinstance(content, dict):
-                files_total += len(content)
-        names = [d.get("name", "") for d in col.find({"owner_id": user}, {"name": 1}).limit(5)]
-        sample = ", ".join([n for n in names if n]) + (" ..." if repo_count > 5 else "")
-
-        print(f"\n== {user} ==")
-        print(f"MongoDB: {db_name}.{coll_name}")
-        print(f"Repos stored: {repo_count}")
-        print(f"Total files captured across repos: {files_total}")
+        row = stats.get(user, {})
+        repo_count = row.get("repos", 0)
+        files_total = row.get("files", 0)
+        sample = ", ".join([n for n in row.get("sample", []) if n])
+        sample += " ..." if sample and repo_count > 5 else ""
+
+        block = [
+            f"\n== {user} ==",
+            f"MongoDB: {db_name}.{coll_name}",
+            f"Repos stored: {repo_count}",
+            f"Total files captured across repos: {files_total}",
+        ]
         if sample:
-            print(f"Sample repos: {sample}")
+            block.append(f"Sample repos: {sample}")
+        # one write() per user instead of a flush per print
+        sys.stdout.write("\n".join(block) + "\n")
 
 
 def main() -> None:
+    ap = argparse.ArgumentParser(description="Summarize crawled repo data.")
+    ap.add_argument(
+        "--all", action="store_true",
+        help="mongo sink only: whole-collection totals via estimatedDocumentCount",
+    )
+    args = ap.parse_args()
+
     cfg = load_config()
 
     gh = cfg.get("github", {})
     users: list[str] = gh.get("users", [])
-    if not users:
-        print("[!] No users configured at github.users in config/crawler.yaml")
-        return
 
     storage = cfg.get("storage", {})
     sink = (storage.get("sink") or "jsonl").lower()
 
+    if not users and not (args.all and sink == "mongo"):
+        print("[!] No users configured at github.users in config/crawler.yaml")
+        return
+
     if sink == "jsonl":
         jsonl_template = storage.get("jsonl_path", "data/raw/github/{user}/repos.jsonl")
         summarize_jsonl(users, jsonl_template)
@@ -113,7 +319,7 @@ def main() -> None:
         uri = storage.get("mongo_uri", "mongodb://localhost:27017")
         db_name = storage.get("mongo_db", "llm_twin")
         coll_name = storage.get("mongo_collection", "repositories")
-        summarize_mongo(users, uri, db_name, coll_name)
+        summarize_mongo(None if args.all else users, uri, db_name, coll_name)
     else:
         print(f"[!] Unknown storage.sink={sink}. Use 'jsonl' or 'mongo'.")
 